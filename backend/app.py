@@ -1,32 +1,68 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
-import io
+import threading
 
-from fastapi import FastAPI, UploadFile, File
+from fastapi import BackgroundTasks, FastAPI, Query, Request, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from PIL import Image
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 from .query_router import route_query
 from .query_rewriter import rewrite_query
-from .ocr_pipeline import ocr_pipeline
 from .hybrid_search import hybrid_search
-from .reranker import rerank
-from .faiss_search import encode_image, faiss_search
+from .reranker import cascade_rerank, rerank_stats
+from .faiss_search import faiss_search
+from .image_cache import analyze_image, image_cache_stats, lookup_image
+from .image_ingest import ingest_image, read_upload
+from .cache import LRUCache
+from .suggest import SUGGEST_K, is_popular, normalize_query, popular_queries, record_query, suggest
+from .static_assets import CachedStaticFiles, RAW_DIR, THUMBNAIL_DIR
+from .response_encoding import dumps, encode_response, page_payload, parse_fields, to_hits
+from .scheduler import (
+    INTERACTIVE,
+    QueueBudget,
+    SchedulerOverloaded,
+    interactive_request,
+    request_context,
+    scheduler_stats,
+    shed_if_overloaded
+)
 
 
 # =========================
 # APP SETUP
 # =========================
 
-app = FastAPI(title="Jewellery Multimodal RAG")
+CANDIDATE_POOL = 30   # cascade reranker scores a wider pool cheaply; also the page limit
+RESULT_K = 10
+
+SEARCH_CACHE_SIZE = 512
+WARM_COUNT = 20       # popular queries precomputed at startup
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Batch priority: warming never delays interactive searches
+    threading.Thread(target=warm_search_cache, daemon=True).start()
+    yield
+
+
+app = FastAPI(title="Jewellery Multimodal RAG", lifespan=lifespan)
 BASE_DIR = Path(__file__).resolve().parent
 
 app.mount(
     "/static",
-    StaticFiles(directory=str(BASE_DIR / "data" / "raw")),
+    CachedStaticFiles(directory=str(RAW_DIR)),
     name="static"
 )
 
+# Built by create_thumbnails.py; URLs are only advertised once the manifest exists
+app.mount(
+    "/thumbnails",
+    CachedStaticFiles(directory=str(THUMBNAIL_DIR), check_dir=False),
+    name="thumbnails"
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -35,6 +71,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# =========================
+# LOAD SHEDDING
+# =========================
+
+OVERLOADED_DETAIL = "Server busy, please retry"
+
+
+@app.exception_handler(SchedulerOverloaded)
+def overloaded_handler(request: Request, exc: SchedulerOverloaded):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": OVERLOADED_DETAIL},
+        headers={"Retry-After": "1"}
+    )
+
 # =========================
 # HEALTH CHECK
 # =========================
@@ -43,12 +94,55 @@ app.add_middleware(
 def health():
     return {"status": "ok"}
 
+# =========================
+# METRICS
+# =========================
+
+@app.get("/metrics")
+def metrics():
+    return {
+        "rerank": rerank_stats(),
+        "image_cache": image_cache_stats(),
+        "scheduler": scheduler_stats(),
+        "search_cache": search_cache.stats()
+    }
+
 # =========================
 # TEXT QUERY ENDPOINT
 # =========================
 
+search_cache = LRUCache(SEARCH_CACHE_SIZE)
+_warming = set()
+_warming_lock = threading.Lock()
+
+
 @app.post("/search/text")
-def search_text(query: str):
+@interactive_request
+def search_text(
+    request: Request,
+    query: str,
+    fields: str | None = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(RESULT_K, ge=1, le=CANDIDATE_POOL)
+):
+    projection = parse_fields(fields)
+
+    record_query(query)
+    response = {"original_query": query, **run_text_search(query)}
+
+    # Later pages are sliced from the cached, fully ranked candidate list
+    return encode_response(request, page_payload(response, offset, limit, projection))
+
+
+def run_text_search(query):
+    key = normalize_query(query)
+    cached = search_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Shed before the LLM call, not at the first model slot after it
+    shed_if_overloaded()
+
     rewritten_query = rewrite_query(query)
 
     routed = route_query(rewritten_query)
@@ -57,73 +151,267 @@ def search_text(query: str):
     candidates = hybrid_search(
         query=rewritten_query,
         category=category,
-        top_k=15
+        top_k=CANDIDATE_POOL
     )
 
-    final_results = rerank(
+    final_results = cascade_rerank(
         query=rewritten_query,
         candidates=candidates,
-        top_k=10
+        top_k=CANDIDATE_POOL
     )
 
-    return {
-        "original_query": query,
+    return cache_text_search(key, rewritten_query, category, final_results)
+
+
+def cache_text_search(key, rewritten_query, category, final_results):
+    response = {
         "rewritten_query": rewritten_query,
         "category": category,
-        "results": final_results
+        "hits": to_hits(final_results)
     }
+    search_cache.put(key, response)
+    return response
+
+# =========================
+# TYPEAHEAD SUGGESTIONS
+# =========================
+
+@app.get("/suggest")
+async def suggest_endpoint(q: str, background_tasks: BackgroundTasks, limit: int = SUGGEST_K):
+    # In-memory prefix lookup only: cheap enough to stay on the event loop
+    suggestions = suggest(q, limit)
+
+    # Speculatively warm the most likely full search the user will submit
+    likely = next((s for s in suggestions if s["type"] == "query"), None)
+    if likely is not None:
+        background_tasks.add_task(warm_query, likely["text"])
+
+    return {"query": q, "suggestions": suggestions}
+
+
+def warm_query(query):
+    key = normalize_query(query)
+    if not is_popular(key) or search_cache.get(key) is not None:
+        return
+
+    with _warming_lock:
+        if key in _warming:
+            return
+        _warming.add(key)
+
+    try:
+        run_text_search(key)
+    except Exception as e:
+        print(f"[SearchCache] Warm-up failed for '{key}': {e}")
+    finally:
+        with _warming_lock:
+            _warming.discard(key)
+
+
+def warm_search_cache():
+    for query in popular_queries(WARM_COUNT):
+        warm_query(query)
 
 # =========================
 # IMAGE QUERY ENDPOINT (FIXED)
 # =========================
 
 @app.post("/search/image")
-async def search_image(file: UploadFile = File(...)):
-    image_bytes = await file.read()
-    image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+async def search_image(
+    request: Request,
+    file: UploadFile = File(...),
+    fields: str | None = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(RESULT_K, ge=1, le=CANDIDATE_POOL)
+):
+    projection = parse_fields(fields)
+    image_bytes = await read_upload(file)
 
-    result = ocr_pipeline(image)
+    # Decoding, LLM and model calls all run off the event loop
+    response = await run_in_threadpool(run_image_search, image_bytes)
 
-    # ---- HANDWRITTEN IMAGE ----
-    if result["type"] == "handwritten":
-        rewritten_text = rewrite_query(result["text"])
+    return encode_response(request, page_payload(response, offset, limit, projection))
 
-        routed = route_query(rewritten_text)
-        category = routed["category"]
 
-        candidates = hybrid_search(
-            query=rewritten_text,
-            category=category,
-            top_k=15
-        )
-
-        final_results = rerank(
-            query=rewritten_text,
-            candidates=candidates,
-            top_k=10
-        )
+@interactive_request
+def run_image_search(image_bytes):
+    # Repeat and catalog uploads are served from the content-addressed cache
+    result = analyze_image(image_bytes)
 
+    # ---- HANDWRITTEN IMAGE ----
+    # Same pipeline (and cache) as a typed query
+    if result["type"] == "handwritten":
         return {
             "query_type": "handwritten",
             "original_text": result["text"],
-            "rewritten_query": rewritten_text,
-            "category": category,
-            "results": final_results
+            **run_text_search(result["text"])
         }
 
     # ---- JEWEL / SKETCH IMAGE (FAISS ONLY) ----
-    query_embedding = encode_image(image)
+    query_embedding = result["embedding"]
 
     # We skip rewrite + routing + hybrid + rerank
     final_results = faiss_search(
         query_embedding=query_embedding,
         category="both",   # no filtering unless you want
-        top_k=10
+        top_k=CANDIDATE_POOL
     )
 
     return {
         "query_type": "image",
         "category": "both",
-        "results": final_results
+        "hits": to_hits(final_results)
     }
 
+
+# =========================
+# STREAMING SEARCH (SSE)
+# =========================
+# Events: "query" → "candidates" → "results" → "done"
+# The frontend renders candidates immediately and reorders on "results".
+# Cached text searches (shared with /search/text) skip "candidates".
+# Each generator step may run on a different threadpool context, so model
+# stages set their request context individually around a shared queue budget.
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+
+def compact(results):
+    return [hit.to_dict() for hit in to_hits(results)]
+
+
+def admit_text_search(text, budget):
+    """
+    Cached response (shared with /search/text) or None once admitted.
+    Sheds before the LLM stages; endpoints call this before the 200 headers.
+    """
+    cached = search_cache.get(normalize_query(text))
+    if cached is None:
+        with request_context(INTERACTIVE, budget):
+            shed_if_overloaded()
+    return cached
+
+
+def stream_text_pipeline(text, query_info, budget, cached=None):
+    # A cached search is already final
+    if cached is not None:
+        yield sse_event("query", {
+            **query_info,
+            "rewritten_query": cached["rewritten_query"],
+            "category": cached["category"]
+        })
+        yield sse_event("results", {
+            "results": [hit.to_dict() for hit in cached["hits"][:RESULT_K]]
+        })
+        yield sse_event("done", {})
+        return
+
+    rewritten = rewrite_query(text)
+    category = route_query(rewritten)["category"]
+
+    yield sse_event("query", {
+        **query_info,
+        "rewritten_query": rewritten,
+        "category": category
+    })
+
+    with request_context(INTERACTIVE, budget):
+        candidates = hybrid_search(
+            query=rewritten,
+            category=category,
+            top_k=CANDIDATE_POOL
+        )
+
+    yield sse_event("candidates", {"results": compact(candidates[:RESULT_K])})
+
+    with request_context(INTERACTIVE, budget):
+        final_results = cascade_rerank(
+            query=rewritten,
+            candidates=candidates,
+            top_k=CANDIDATE_POOL
+        )
+
+    response = cache_text_search(normalize_query(text), rewritten, category, final_results)
+
+    yield sse_event("results", {
+        "results": [hit.to_dict() for hit in response["hits"][:RESULT_K]]
+    })
+    yield sse_event("done", {})
+
+
+def stream_image_pipeline(image_bytes, budget, result=None, ingested=None):
+    if result is None:
+        with request_context(INTERACTIVE, budget):
+            result = analyze_image(image_bytes, ingested)
+
+    if result["type"] == "handwritten":
+        # Mid-stream: shedding here is reported as an "error" event
+        cached = admit_text_search(result["text"], budget)
+        yield from stream_text_pipeline(result["text"], {
+            "query_type": "handwritten",
+            "original_text": result["text"]
+        }, budget, cached)
+        return
+
+    yield sse_event("query", {"query_type": "image", "category": "both"})
+
+    final_results = faiss_search(
+        query_embedding=result["embedding"],
+        category="both",
+        top_k=RESULT_K
+    )
+
+    # FAISS hits are already final: no rerank stage for image queries
+    yield sse_event("results", {"results": compact(final_results)})
+    yield sse_event("done", {})
+
+
+def shed_as_event(events):
+    # Headers are already sent mid-stream: report later shedding (at a
+    # model slot) as an event; overload at admission is a plain 503
+    try:
+        yield from events
+    except SchedulerOverloaded:
+        yield sse_event("error", {"status": 503, "detail": OVERLOADED_DETAIL})
+
+
+def event_stream(events):
+    return StreamingResponse(
+        shed_as_event(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/search/text/stream")
+def search_text_stream(query: str):
+    record_query(query)
+
+    budget = QueueBudget()
+    cached = admit_text_search(query, budget)
+
+    return event_stream(
+        stream_text_pipeline(query, {"original_query": query}, budget, cached)
+    )
+
+
+@app.post("/search/image/stream")
+async def search_image_stream(file: UploadFile = File(...)):
+    # Read before streaming: the upload is closed once the endpoint returns
+    image_bytes = await read_upload(file)
+
+    # Repeat and catalog uploads are a hash lookup. Only a miss is decoded,
+    # here rather than in the stream, so 400/413 precede the 200 headers
+    result = await run_in_threadpool(lookup_image, image_bytes)
+    budget = QueueBudget()
+    ingested = None
+
+    if result is None:
+        ingested = await run_in_threadpool(ingest_image, image_bytes)
+
+        # Shed before the vision LLM stage with a 503, not a mid-stream event
+        with request_context(INTERACTIVE, budget):
+            shed_if_overloaded()
+
+    return event_stream(stream_image_pipeline(image_bytes, budget, result, ingested))
@@ -0,0 +1,109 @@
+"""
+Synthetic scale benchmark for sharded retrieval
+Throughput (queries/sec) versus shard count on one machine
+
+python benchmark_shards.py --items 1000000 --shards 1 2 4 8
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from sharding import ShardedRetriever, build_shards
+
+# =========================
+# SYNTHETIC CATALOG
+# =========================
+
+CATEGORIES = ["ring", "necklace"]
+
+
+def synthetic_catalog(n_items, dim, vocab_size, doc_len, seed=0):
+    rng = np.random.default_rng(seed)
+
+    embeddings = rng.standard_normal((n_items, dim), dtype=np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    # Zipf-like term distribution, as in real descriptions
+    weights = 1.0 / np.arange(1, vocab_size + 1)
+    weights /= weights.sum()
+    term_ids = rng.choice(vocab_size, size=(n_items, doc_len), p=weights)
+    documents = [[f"t{t}" for t in row] for row in term_ids]
+
+    categories = [CATEGORIES[i % len(CATEGORIES)] for i in range(n_items)]
+    keys = [f"item_{i}" for i in range(n_items)]
+
+    return embeddings, categories, documents, keys
+
+
+def synthetic_queries(n_queries, dim, vocab_size, seed=1):
+    rng = np.random.default_rng(seed)
+
+    vectors = rng.standard_normal((n_queries, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    tokens = [[f"t{t}" for t in rng.integers(0, vocab_size // 10, size=3)] for _ in range(n_queries)]
+
+    return [(vectors[i:i + 1], tokens[i]) for i in range(n_queries)]
+
+# =========================
+# BENCHMARK
+# =========================
+
+def run(retriever, queries, concurrency, top_k):
+    def one(query):
+        start = time.perf_counter()
+        retriever.search(query_embedding=query[0], tokens=query[1], category="both", top_k=top_k)
+        return time.perf_counter() - start
+
+    retriever.search(query_embedding=queries[0][0], tokens=queries[0][1], top_k=top_k)  # warm-up
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, queries))
+    elapsed = time.perf_counter() - start
+
+    return len(queries) / elapsed, statistics.median(latencies), max(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--vocab", type=int, default=5000)
+    parser.add_argument("--doc-len", type=int, default=12)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--mode", choices=["process", "thread"], default="process")
+    args = parser.parse_args()
+
+    print(f"Generating {args.items} items (dim={args.dim}) ...")
+    embeddings, categories, documents, keys = synthetic_catalog(
+        args.items, args.dim, args.vocab, args.doc_len
+    )
+    queries = synthetic_queries(args.queries, args.dim, args.vocab)
+
+    print(f"{'shards':>6} {'build s':>8} {'qps':>8} {'p50 ms':>8} {'max ms':>8}")
+
+    for n_shards in args.shards:
+        with tempfile.TemporaryDirectory() as shard_dir:
+            start = time.perf_counter()
+            build_shards(embeddings, categories, documents, keys, shard_dir, n_shards)
+            build_time = time.perf_counter() - start
+
+            retriever = ShardedRetriever(shard_dir, mode=args.mode)
+            try:
+                qps, p50, worst = run(retriever, queries, args.concurrency, args.top_k)
+            finally:
+                retriever.close()
+
+        print(f"{n_shards:>6} {build_time:>8.1f} {qps:>8.1f} {p50 * 1000:>8.1f} {worst * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ import pickle
 import re
 from pathlib import Path
 
+from .sharded_search import retriever, sharded_bm25_search
+
 # =========================
 # CONFIG
 # =========================
@@ -25,8 +27,10 @@ def load_bm25(category):
         data = pickle.load(f)
     return data["bm25"], data["id_map"]
 
-bm25_ring, ring_map = load_bm25("ring")
-bm25_necklace, necklace_map = load_bm25("necklace")
+# Sharded mode: BM25 segments live in the shard workers
+if retriever is None:
+    bm25_ring, ring_map = load_bm25("ring")
+    bm25_necklace, necklace_map = load_bm25("necklace")
 
 
 def tokenize(text: str):
@@ -37,6 +41,9 @@ def tokenize(text: str):
 # =========================
 
 def bm25_search(query, category="both", top_k=TOP_K):
+    if retriever is not None:
+        return sharded_bm25_search(query, category=category, top_k=top_k)
+
     tokens = tokenize(query)
     results = []
 
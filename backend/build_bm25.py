@@ -1,11 +1,13 @@
 """
 Build BM25 corpus from jewellery metadata
 Ring and Necklace handled separately
+Also builds the /suggest vocabulary (catalog terms + logged popular queries)
 """
 
 import json
 import pickle
 import re
+from collections import Counter
 from pathlib import Path
 
 from rank_bm25 import BM25Okapi
@@ -16,6 +18,9 @@ from rank_bm25 import BM25Okapi
 
 METADATA_DIR = Path("data/metadata")
 OUTPUT_DIR = Path("bm25")
+QUERY_LOG_PATH = Path("logs/queries.log")
+SUGGEST_PATH = OUTPUT_DIR / "suggest_vocab.json"
+MIN_QUERY_COUNT = 3    # same as suggest.WARM_MIN_COUNT: rarer queries stay private
 
 OUTPUT_DIR.mkdir(exist_ok=True)
 
@@ -25,6 +30,13 @@ FILES = {
 }
 
 
+SUGGEST_STOPWORDS = {
+    "a", "an", "and", "by", "features", "featuring", "in", "is", "it",
+    "its", "no", "of", "on", "set", "the", "this", "with"
+}
+EMPTY_VALUES = {"", "none", "unknown"}
+
+
 def tokenize(text: str):
     return re.findall(r"[a-z0-9]+", text.lower())
 
@@ -43,10 +55,40 @@ def metadata_to_text(item):
     ]
     return " ".join(fields).lower()
 
+
+def suggest_phrases(item):
+    """Single terms plus attribute phrases shaped like real queries."""
+    phrases = [
+        t for t in tokenize(metadata_to_text(item))
+        if t not in SUGGEST_STOPWORDS and t not in EMPTY_VALUES and len(t) > 1
+    ]
+
+    category = item.get("category", "")
+    values = {
+        field: item.get(field, "").lower()
+        for field in ("material", "stone_type", "stone_shape", "color")
+    }
+    values = {k: v for k, v in values.items() if v not in EMPTY_VALUES}
+
+    phrases.extend(values.values())
+    for field in ("material", "stone_type", "color"):
+        if field in values:
+            phrases.append(f"{values[field]} {category}")
+    if "material" in values and "stone_type" in values:
+        phrases.append(f"{values['material']} {category} with {values['stone_type']}")
+
+    return phrases
+
+
+def normalize_query(text: str):
+    return " ".join(text.lower().split())
+
 # =========================
 # BUILD BM25
 # =========================
 
+vocabulary = Counter()
+
 for category, file_name in FILES.items():
     with open(METADATA_DIR / file_name, "r") as f:
         data = json.load(f)
@@ -59,6 +101,7 @@ for category, file_name in FILES.items():
         tokens = tokenize(text)
         corpus.append(tokens)
         id_map.append(item)
+        vocabulary.update(suggest_phrases(item))
 
     bm25 = BM25Okapi(corpus)
 
@@ -73,3 +116,33 @@ for category, file_name in FILES.items():
         )
 
     print(f"BM25 index built for {category} ({len(corpus)} documents)")
+
+# =========================
+# BUILD SUGGEST VOCABULARY
+# =========================
+
+query_counts = Counter()
+
+if QUERY_LOG_PATH.exists():
+    with open(QUERY_LOG_PATH, "r") as f:
+        for line in f:
+            query = normalize_query(line)
+            if query:
+                query_counts[query] += 1
+
+popular_queries = {
+    query: count
+    for query, count in query_counts.items()
+    if count >= MIN_QUERY_COUNT
+}
+
+with open(SUGGEST_PATH, "w") as f:
+    json.dump(
+        {
+            "vocabulary": sorted(vocabulary.items()),
+            "queries": sorted(popular_queries.items())
+        },
+        f
+    )
+
+print(f"Suggest vocabulary built ({len(vocabulary)} terms, {len(popular_queries)} popular queries)")
@@ -0,0 +1,63 @@
+"""
+Build sharded FAISS + BM25 retrieval segments
+Partition by hash of item id, or one shard per category
+"""
+
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+
+from sharding import build_shards
+
+# =========================
+# CONFIG
+# =========================
+
+EMBEDDING_PATH = Path("embeddings/image_embeddings.npy")
+ID_MAPPING_PATH = Path("embeddings/id_mapping.json")
+OUTPUT_DIR = Path("shards")
+
+N_SHARDS = 4
+PARTITION = "hash"   # "hash" or "category"
+
+
+def tokenize(text: str):
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+# =========================
+# HELPERS
+# =========================
+
+def metadata_to_text(item):
+    fields = [
+        item.get("category", ""),
+        item.get("material", ""),
+        item.get("stone_type", ""),
+        item.get("stone_shape", ""),
+        item.get("color", ""),
+        item.get("short_description", "")
+    ]
+    return " ".join(fields).lower()
+
+# =========================
+# BUILD SHARDS
+# =========================
+
+embeddings = np.load(EMBEDDING_PATH).astype("float32")
+
+with open(ID_MAPPING_PATH, "r") as f:
+    id_mapping = json.load(f)
+
+manifest = build_shards(
+    embeddings=embeddings,
+    categories=[m["category"] for m in id_mapping],
+    documents=[tokenize(metadata_to_text(m["metadata"])) for m in id_mapping],
+    keys=[m["id"] for m in id_mapping],
+    out_dir=OUTPUT_DIR,
+    n_shards=N_SHARDS,
+    partition=PARTITION
+)
+
+print(f"Built {manifest['n_shards']} shards ({PARTITION}) over {manifest['n_items']} items")
@@ -0,0 +1,93 @@
+"""
+Create fixed-size thumbnail variants for jewellery images
+JPEG + WebP per size, plus a manifest with content hashes
+Manifest paths are relative to data/
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+from PIL import Image
+from tqdm import tqdm
+
+# =========================
+# CONFIG
+# =========================
+
+RAW_DIR = Path("data/raw")
+METADATA_DIR = Path("data/metadata")
+OUTPUT_DIR = Path("data/thumbnails")
+MANIFEST_PATH = OUTPUT_DIR / "manifest.json"
+
+SIZES = {
+    "thumb": 160,    # result cards
+    "medium": 320    # detail modal
+}
+
+FORMATS = {
+    "jpg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+    "webp": ("WEBP", {"quality": 80, "method": 6})
+}
+
+# =========================
+# HELPERS
+# =========================
+
+def load_metadata():
+    all_items = []
+
+    for file in ["ring_metadata.json", "necklace_metadata.json"]:
+        with open(METADATA_DIR / file, "r") as f:
+            all_items.extend(json.load(f))
+
+    return all_items
+
+
+def file_hash(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+
+# =========================
+# BUILD VARIANTS
+# =========================
+
+manifest = {}
+
+for item in tqdm(load_metadata(), desc="Creating thumbnails"):
+    category = item["category"]
+    image_name = item["image_name"]
+
+    source = RAW_DIR / category / image_name
+    if not source.exists():
+        continue
+
+    (OUTPUT_DIR / category).mkdir(parents=True, exist_ok=True)
+
+    image = Image.open(source).convert("RGB")
+    original = {"path": f"raw/{category}/{image_name}", "hash": file_hash(source)}
+    variants = {"original": original}
+
+    for size_name, size in SIZES.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+
+        for ext, (fmt, options) in FORMATS.items():
+            key = size_name if ext == "jpg" else f"{size_name}_{ext}"
+
+            # Source already fits: re-encoding the JPEG would only grow it
+            if ext == "jpg" and max(image.size) <= size:
+                variants[key] = original
+                continue
+
+            rel_path = f"thumbnails/{category}/{Path(image_name).stem}_{size_name}.{ext}"
+            out_path = OUTPUT_DIR.parent / rel_path
+            resized.save(out_path, format=fmt, **options)
+
+            variants[key] = {"path": rel_path, "hash": file_hash(out_path)}
+
+    manifest[f"{category}/{image_name}"] = variants
+
+with open(MANIFEST_PATH, "w") as f:
+    json.dump(manifest, f, indent=2)
+
+print(f"Thumbnails created for {len(manifest)} images")
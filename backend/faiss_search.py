@@ -13,6 +13,9 @@ import numpy as np
 import torch
 from transformers import CLIPProcessor, CLIPModel
 
+from .scheduler import inference_slot
+from .sharded_search import retriever, sharded_faiss_search
+
 # =========================
 # CONFIG
 # =========================
@@ -31,7 +34,8 @@ OVERFETCH_K = 50  # fetch more, then filter
 # LOAD EVERYTHING
 # =========================
 
-index = faiss.read_index(str(FAISS_INDEX_PATH))
+# Sharded mode: the shard workers hold the vectors, this process only encodes
+index = faiss.read_index(str(FAISS_INDEX_PATH)) if retriever is None else None
 
 with open(ID_MAPPING_PATH, "r") as f:
     id_mapping = json.load(f)
@@ -48,7 +52,7 @@ model.eval()
 def encode_text(query: str) -> np.ndarray:
     inputs = processor(text=query, return_tensors="pt", padding=True).to(DEVICE)
 
-    with torch.no_grad():
+    with inference_slot(), torch.no_grad():
         outputs = model.text_model(
             input_ids=inputs["input_ids"],
             attention_mask=inputs["attention_mask"]
@@ -60,11 +64,15 @@ def encode_text(query: str) -> np.ndarray:
 
     return text_features.cpu().numpy().astype("float32").reshape(1,-1)
 
-def encode_image(image):
-    inputs = processor(images=image, return_tensors="pt").to(DEVICE)
+def preprocess_image(image) -> torch.Tensor:
+    return processor(images=image, return_tensors="pt")["pixel_values"]
+
+def encode_image(image=None, pixel_values=None):
+    if pixel_values is None:
+        pixel_values = preprocess_image(image)
 
-    with torch.no_grad():
-        outputs = model.vision_model(**inputs)
+    with inference_slot(), torch.no_grad():
+        outputs = model.vision_model(pixel_values=pixel_values.to(DEVICE))
         image_features = outputs.pooler_output
         image_features = model.visual_projection(image_features)
         image_features = image_features / image_features.norm(dim=-1, keepdim=True)
@@ -77,6 +85,9 @@ def encode_image(image):
 # =========================
 
 def faiss_search(query_embedding, category="both", top_k=TOP_K):
+    if retriever is not None:
+        return sharded_faiss_search(query_embedding, category=category, top_k=top_k)
+
     scores, indices = index.search(query_embedding, OVERFETCH_K)
 
     results = []
@@ -7,6 +7,7 @@ import numpy as np
 
 from .faiss_search import encode_text, faiss_search
 from .bm25_search import bm25_search
+from .sharded_search import retriever, sharded_search
 
 # =========================
 # CONFIG
@@ -37,10 +38,18 @@ def min_max_normalize(scores):
 # =========================
 
 def hybrid_search(query, category="both", top_k=TOP_K):
-    # ---- FAISS ----
     query_embedding = encode_text(query)
-    faiss_results = faiss_search(query_embedding, category=category, top_k=top_k)
 
+    # ---- SHARDED (dense + sparse in one fan-out) ----
+    if retriever is not None:
+        faiss_results, bm25_results = sharded_search(
+            query, query_embedding, category=category, top_k=top_k
+        )
+    else:
+        faiss_results = faiss_search(query_embedding, category=category, top_k=top_k)
+        bm25_results = bm25_search(query, category=category, top_k=top_k)
+
+    # ---- FAISS ----
     faiss_scores = [r["score"] for r in faiss_results]
     faiss_norm = min_max_normalize(faiss_scores)
 
@@ -53,7 +62,6 @@ def hybrid_search(query, category="both", top_k=TOP_K):
         }
 
     # ---- BM25 ----
-    bm25_results = bm25_search(query, category=category, top_k=top_k)
     bm25_scores = [r["score"] for r in bm25_results]
     bm25_norm = min_max_normalize(bm25_scores)
 
@@ -71,6 +79,8 @@ def hybrid_search(query, category="both", top_k=TOP_K):
     for k, v in faiss_dict.items():
         fused[k] = {
             "score": float(FAISS_WEIGHT * v["score"]),
+            "dense_score": float(v["score"]),
+            "sparse_score": 0.0,
             "metadata": v["metadata"],
             "category": v["category"]
         }
@@ -78,9 +88,12 @@ def hybrid_search(query, category="both", top_k=TOP_K):
     for k, v in bm25_dict.items():
         if k in fused:
             fused[k]["score"] += float(BM25_WEIGHT * v["score"])
+            fused[k]["sparse_score"] = float(v["score"])
         else:
             fused[k] = {
                 "score": BM25_WEIGHT * v["score"],
+                "dense_score": 0.0,
+                "sparse_score": float(v["score"]),
                 "metadata": v["metadata"],
                 "category": v["category"]
             }
@@ -0,0 +1,154 @@
+"""
+Content-addressed cache for uploaded images
+Exact copy → SHA-256 of the bytes
+Catalog copy → stored embedding from image_embeddings.npy, no LLM or CLIP call
+
+No perceptual near-duplicate matching: catalog photos share studio
+backgrounds and framing, and no pixel-level hash or correlation separates
+re-encoded copies from different items on this catalog.
+"""
+
+import hashlib
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from .cache import LRUCache
+from .ocr_pipeline import ocr_pipeline
+from .faiss_search import encode_image, id_mapping
+from .image_ingest import ingest_image
+from .scheduler import shed_if_overloaded
+
+# =========================
+# CONFIG
+# =========================
+
+BASE_DIR = Path(__file__).resolve().parent
+EMBEDDINGS_PATH = BASE_DIR / "embeddings" / "image_embeddings.npy"
+CATALOG_DIRS = [
+    BASE_DIR / "data" / "raw",
+    BASE_DIR / "data" / "processed"
+]
+
+CACHE_SIZE = 256
+SAME_IMAGE_COSINE = 0.999   # items sharing a file must share an embedding
+
+# =========================
+# HASHING
+# =========================
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+# =========================
+# LOAD CATALOG
+# =========================
+
+embeddings = np.load(EMBEDDINGS_PATH, mmap_mode="r")
+
+catalog_items = {}
+for entry in id_mapping:
+    for directory in CATALOG_DIRS:
+        path = directory / entry["category"] / entry["image_name"]
+        if path.exists():
+            catalog_items.setdefault(content_hash(path.read_bytes()), set()).add(
+                entry["faiss_index"]
+            )
+
+# A digest only short-cuts to a stored embedding when every item with that
+# file has the same embedding; otherwise different items would be merged
+catalog_hashes = {}
+for digest, indices in catalog_items.items():
+    indices = sorted(indices)
+    vectors = np.asarray(embeddings[indices], dtype="float32")
+
+    if (vectors @ vectors[0]).min() >= SAME_IMAGE_COSINE:
+        catalog_hashes[digest] = indices[0]
+    else:
+        ids = [id_mapping[i]["id"] for i in indices]
+        print(f"[ImageCache] Catalog items share a file but not an embedding: {ids}")
+
+# =========================
+# CACHE
+# =========================
+
+cache = LRUCache(CACHE_SIZE)
+
+_stats_lock = threading.Lock()
+_stats = {
+    "exact_hits": 0,
+    "catalog_hits": 0,
+    "misses": 0
+}
+
+
+def _record(kind):
+    with _stats_lock:
+        _stats[kind] += 1
+
+
+def image_cache_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    stats.update(size=len(cache), maxsize=cache.maxsize)
+    return stats
+
+# =========================
+# ANALYZE UPLOAD
+# =========================
+
+def lookup_image(image_bytes: bytes):
+    """Cached analysis for a repeat or catalog upload, else None. No decoding."""
+    digest = content_hash(image_bytes)
+
+    entry = cache.get(digest)
+    if entry is not None:
+        _record("exact_hits")
+        return entry
+
+    if digest in catalog_hashes:
+        _record("catalog_hits")
+        idx = catalog_hashes[digest]
+        entry = {
+            "type": "image",
+            "text": None,
+            "embedding": np.array(embeddings[idx:idx + 1], dtype="float32")
+        }
+        cache.put(digest, entry)
+        return entry
+
+    return None
+
+
+def analyze_image(image_bytes: bytes, ingested=None):
+    """
+    Returns {"type", "text", "embedding"} for an upload.
+    "embedding" is set for image queries, "text" for handwritten ones.
+    Pass `ingested` when the caller already decoded the upload.
+    """
+    entry = lookup_image(image_bytes)
+    if entry is not None:
+        return entry
+
+    # Decode once: the bounded image feeds the handwriting check,
+    # the pixel tensor feeds CLIP
+    if ingested is None:
+        ingested = ingest_image(image_bytes)
+
+    _record("misses")
+
+    # Shed before the vision LLM call, not at the CLIP slot after it
+    shed_if_overloaded()
+    result = ocr_pipeline(ingested["image"])
+
+    entry = {
+        "type": result["type"],
+        "text": result.get("text"),
+        "embedding": (
+            encode_image(pixel_values=ingested["pixel_values"])
+            if result["type"] == "image" else None
+        )
+    }
+    cache.put(content_hash(image_bytes), entry)
+    return entry
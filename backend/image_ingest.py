@@ -0,0 +1,84 @@
+"""
+Bounded image ingestion for /search/image
+Size limit enforced while reading
+Reduced-resolution JPEG decode (draft mode) near the target size
+One decoded image + one CLIP pixel tensor per upload
+"""
+
+import io
+
+from fastapi import HTTPException, UploadFile
+from PIL import Image, UnidentifiedImageError
+
+from .faiss_search import preprocess_image
+
+# =========================
+# CONFIG
+# =========================
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+MAX_PIXELS = 50_000_000
+CHUNK_SIZE = 64 * 1024
+
+# Large enough for the vision LLM to read handwriting,
+# small enough that CLIP's 224px resize is cheap
+DECODE_SIZE = 768
+
+# =========================
+# READ
+# =========================
+
+async def read_upload(file: UploadFile, max_bytes=MAX_UPLOAD_BYTES) -> bytes:
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail="Upload too large")
+
+    buffer = bytearray()
+
+    while True:
+        chunk = await file.read(CHUNK_SIZE)
+        if not chunk:
+            break
+
+        buffer.extend(chunk)
+        if len(buffer) > max_bytes:
+            raise HTTPException(status_code=413, detail="Upload too large")
+
+    return bytes(buffer)
+
+# =========================
+# DECODE (run off the event loop)
+# =========================
+
+def decode_image(image_bytes: bytes, size=DECODE_SIZE) -> Image.Image:
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+    except Image.DecompressionBombError:
+        raise HTTPException(status_code=413, detail="Image dimensions too large")
+    except UnidentifiedImageError:
+        raise HTTPException(status_code=400, detail="Unsupported image format")
+
+    # Header only so far: reject oversized images before decoding pixels
+    width, height = image.size
+    if width * height > MAX_PIXELS:
+        raise HTTPException(status_code=413, detail="Image dimensions too large")
+
+    try:
+        # JPEG only: decode at 1/2, 1/4 or 1/8 scale, never below `size`
+        image.draft("RGB", (size, size))
+
+        image = image.convert("RGB")
+        image.thumbnail((size, size), Image.Resampling.BICUBIC)
+    except OSError:
+        # Truncated or corrupt pixel data
+        raise HTTPException(status_code=400, detail="Corrupt image data")
+
+    return image
+
+
+def ingest_image(image_bytes: bytes):
+    image = decode_image(image_bytes)
+
+    return {
+        "image": image,
+        "pixel_values": preprocess_image(image)
+    }
@@ -1,10 +1,20 @@
 """
 Cross-encoder reranker for jewellery RAG
 Final accuracy refinement step
+
+Cascade mode:
+Confident fusion → skip reranking
+Cheap lexical scorer → whole candidate pool
+Cross-encoder → uncertain top slice only (per-request budget)
 """
 
+import re
+import threading
+
 from sentence_transformers import CrossEncoder
 
+from .scheduler import inference_slot
+
 # =========================
 # CONFIG
 # =========================
@@ -12,12 +22,59 @@ from sentence_transformers import CrossEncoder
 MODEL_NAME = "cross-encoder/ms-marco-MiniLM-L-6-v2"
 TOP_K = 10
 
+# ---- cascade ----
+SKIP_MARGIN = 0.25          # fused top-1 vs top-2 gap that counts as a clear winner
+AGREEMENT_K = 3             # dense and sparse must agree on this many top items
+CHEAP_WEIGHT = 0.5          # weight of lexical overlap in the first-stage score
+UNCERTAIN_MARGIN = 0.2      # cheap-score gap to the leader that is still "uncertain"
+MIN_SLICE = 2
+CROSS_ENCODER_BUDGET = 8    # max cross-encoder pairs per request
+
+# Same list as build_bm25.SUGGEST_STOPWORDS: words most descriptions contain
+STOPWORDS = {
+    "a", "an", "and", "by", "features", "featuring", "in", "is", "it",
+    "its", "no", "of", "on", "set", "the", "this", "with"
+}
+METADATA_FIELDS = (
+    "category", "material", "stone_type", "stone_shape", "color", "short_description"
+)
+
 # =========================
 # LOAD MODEL
 # =========================
 
 reranker_model = CrossEncoder(MODEL_NAME)
 
+# =========================
+# STATS
+# =========================
+
+_stats_lock = threading.Lock()
+_stats = {
+    "requests": 0,
+    "skipped": 0,
+    "cross_encoder_pairs": 0
+}
+
+
+def _record(skipped, pairs):
+    with _stats_lock:
+        _stats["requests"] += 1
+        _stats["skipped"] += int(skipped)
+        _stats["cross_encoder_pairs"] += pairs
+
+
+def rerank_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+
+    requests = stats["requests"]
+    stats["skip_rate"] = stats["skipped"] / requests if requests else 0.0
+    stats["avg_pairs_per_request"] = (
+        stats["cross_encoder_pairs"] / requests if requests else 0.0
+    )
+    return stats
+
 # =========================
 # HELPERS
 # =========================
@@ -32,6 +89,30 @@ def metadata_to_text(metadata):
         f"Description: {metadata.get('short_description', '')}."
     )
 
+
+def tokenize(text: str):
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def content_tokens(text: str):
+    return {t for t in tokenize(text) if t not in STOPWORDS}
+
+
+def metadata_tokens(metadata):
+    """Tokens of the metadata values only, without metadata_to_text's labels."""
+    return content_tokens(" ".join(str(metadata.get(f) or "") for f in METADATA_FIELDS))
+
+
+def cross_encode(query, candidates):
+    pairs = [(query, metadata_to_text(c["metadata"])) for c in candidates]
+    with inference_slot():
+        scores = reranker_model.predict(pairs)
+
+    for c, s in zip(candidates, scores):
+        c["rerank_score"] = float(s)
+
+    return len(pairs)
+
 # =========================
 # RERANK
 # =========================
@@ -40,16 +121,76 @@ def rerank(query, candidates, top_k=TOP_K):
     if not candidates:
         return []
 
-    pairs = []
+    pairs = cross_encode(query, candidates)
+    _record(skipped=False, pairs=pairs)
+
+    candidates.sort(key=lambda x: x["rerank_score"], reverse=True)
+
+    return candidates[:top_k]
+
+# =========================
+# CASCADE RERANK
+# =========================
+
+def is_confident(candidates):
+    """
+    Fused ranking is trusted when the leader is far ahead,
+    or when dense and sparse retrieval agree on the top items.
+    """
+    if len(candidates) < 2:
+        return True
+
+    ranked = sorted(candidates, key=lambda x: x["score"], reverse=True)
+    if ranked[0]["score"] - ranked[1]["score"] >= SKIP_MARGIN:
+        return True
+
+    k = min(AGREEMENT_K, len(candidates))
+    dense_top = sorted(candidates, key=lambda x: x.get("dense_score", 0.0), reverse=True)[:k]
+    sparse_top = sorted(candidates, key=lambda x: x.get("sparse_score", 0.0), reverse=True)[:k]
+
+    dense_ids = {c["metadata"]["id"] for c in dense_top if c.get("dense_score", 0.0) > 0}
+    sparse_ids = {c["metadata"]["id"] for c in sparse_top if c.get("sparse_score", 0.0) > 0}
+
+    return len(dense_ids) == k and dense_ids == sparse_ids
+
+
+def cheap_score(query_tokens, candidate):
+    if not query_tokens:
+        return candidate["score"]
+
+    doc_tokens = metadata_tokens(candidate["metadata"])
+    overlap = sum(1 for t in query_tokens if t in doc_tokens) / len(query_tokens)
+
+    return candidate["score"] + CHEAP_WEIGHT * overlap
+
+
+def cascade_rerank(query, candidates, top_k=TOP_K, budget=CROSS_ENCODER_BUDGET):
+    if not candidates:
+        return []
+
+    # ---- STAGE 0: skip when fusion is already confident ----
+    if is_confident(candidates):
+        _record(skipped=True, pairs=0)
+        candidates.sort(key=lambda x: x["score"], reverse=True)
+        return candidates[:top_k]
+
+    # ---- STAGE 1: cheap lexical scorer over the whole pool ----
+    query_tokens = content_tokens(query)
     for c in candidates:
-        text = metadata_to_text(c["metadata"])
-        pairs.append((query, text))
+        c["cheap_score"] = cheap_score(query_tokens, c)
 
-    scores = reranker_model.predict(pairs)
+    candidates.sort(key=lambda x: x["cheap_score"], reverse=True)
 
-    for c, s in zip(candidates, scores):
-        c["rerank_score"] = float(s)
+    # ---- STAGE 2: cross-encoder on the uncertain top slice ----
+    leader = candidates[0]["cheap_score"]
+    slice_size = sum(1 for c in candidates if leader - c["cheap_score"] <= UNCERTAIN_MARGIN)
+    slice_size = min(max(slice_size, MIN_SLICE), budget, len(candidates))
 
-    candidates.sort(key=lambda x: x["rerank_score"], reverse=True)
+    head = candidates[:slice_size]
+    pairs = cross_encode(query, head) if slice_size > 1 else 0
+    _record(skipped=False, pairs=pairs)
 
-    return candidates[:top_k]
+    if pairs:
+        head.sort(key=lambda x: x["rerank_score"], reverse=True)
+
+    return (head + candidates[slice_size:])[:top_k]
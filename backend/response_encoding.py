@@ -0,0 +1,165 @@
+"""
+Compact search response encoding
+Slots-based hits, optional fields= projection, offset/limit pages
+orjson serialization with brotli/gzip negotiation
+"""
+
+import gzip
+
+import brotli
+import orjson
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+
+from .static_assets import image_urls
+
+# =========================
+# CONFIG
+# =========================
+
+MIN_COMPRESS_SIZE = 500     # bytes; smaller bodies are not worth the CPU
+BROTLI_QUALITY = 5
+GZIP_LEVEL = 6
+
+NESTED_FIELDS = ("metadata", "images")
+
+# =========================
+# COMPACT HIT
+# =========================
+
+class SearchHit:
+    __slots__ = ("id", "score", "rerank_score", "metadata", "images")
+
+    def __init__(self, id, score, metadata, images, rerank_score=None):
+        self.id = id
+        self.score = score
+        self.rerank_score = rerank_score
+        self.metadata = metadata
+        self.images = images
+
+    @classmethod
+    def from_result(cls, result):
+        """Works for hybrid_search, faiss_search and reranker results."""
+        metadata = result["metadata"]
+        return cls(
+            id=metadata["id"],
+            score=result["score"],
+            metadata=metadata,
+            images=image_urls(metadata["category"], metadata["image_name"]),
+            rerank_score=result.get("rerank_score")
+        )
+
+    def to_dict(self, fields=None):
+        if fields is None:
+            data = {
+                "id": self.id,
+                "score": self.score,
+                "metadata": self.metadata,
+                "images": self.images
+            }
+            if self.rerank_score is not None:
+                data["rerank_score"] = self.rerank_score
+            return data
+
+        data = {}
+        for name, sub in fields:
+            value = getattr(self, name)
+            if value is None:
+                continue
+
+            if sub is None:
+                data[name] = value
+            elif sub in value:
+                data.setdefault(name, {})[sub] = value[sub]
+        return data
+
+
+def to_hits(results):
+    return [SearchHit.from_result(r) for r in results]
+
+# =========================
+# PROJECTION + PAGINATION
+# =========================
+
+def parse_fields(fields):
+    """"id,score,metadata.material" → (("id", None), ..., ("metadata", "material"))"""
+    if not fields:
+        return None
+
+    parsed = []
+    for field in fields.split(","):
+        field = field.strip()
+        if not field:
+            continue
+
+        name, _, sub = field.partition(".")
+        if name not in SearchHit.__slots__ or (sub and name not in NESTED_FIELDS):
+            raise HTTPException(status_code=400, detail=f"Unknown field: {field}")
+
+        parsed.append((name, sub or None))
+
+    return tuple(parsed) or None
+
+
+def page_payload(response, offset, limit, fields=None):
+    """Slice the cached hit list into one page of the response."""
+    hits = response["hits"]
+    payload = {k: v for k, v in response.items() if k != "hits"}
+
+    payload.update(
+        results=[h.to_dict(fields) for h in hits[offset:offset + limit]],
+        total=len(hits),
+        offset=offset,
+        limit=limit
+    )
+    return payload
+
+# =========================
+# ENCODING
+# =========================
+
+def dumps(payload) -> bytes:
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def accepted_encodings(header):
+    """Codings from an Accept-Encoding header, minus those refused with q=0."""
+    accepted = set()
+
+    for part in header.split(","):
+        name, *params = [p.strip() for p in part.split(";")]
+
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+
+        if name and q > 0:
+            accepted.add(name.lower())
+
+    return accepted
+
+
+def encode_response(request: Request, payload, status_code=200):
+    body = dumps(payload)
+    headers = {"Vary": "Accept-Encoding"}
+
+    if len(body) >= MIN_COMPRESS_SIZE:
+        accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+
+        if "br" in accepted:
+            body = brotli.compress(body, quality=BROTLI_QUALITY)
+            headers["Content-Encoding"] = "br"
+        elif "gzip" in accepted:
+            body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+            headers["Content-Encoding"] = "gzip"
+
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers
+    )
@@ -0,0 +1,214 @@
+"""
+Inference scheduler for CLIP and cross-encoder forward passes
+Bounded concurrency slots, each with an explicit torch thread budget
+Priority queue: interactive /search/* before batch work
+Queue-time budget per request → 503 instead of a timeout
+"""
+
+import contextvars
+import functools
+import heapq
+import itertools
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import torch
+
+# =========================
+# CONFIG
+# =========================
+
+INFERENCE_SLOTS = 2
+THREADS_PER_SLOT = max(1, (os.cpu_count() or 1) // INFERENCE_SLOTS)
+
+INTERACTIVE = 0
+BATCH = 1
+
+# Seconds a search may spend in total queued for model slots. LLM calls and
+# model execution do not count; searches are shed early (before the LLM
+# stages) when the queue alone would already exceed this
+INTERACTIVE_TIMEOUT = 5.0
+
+# Intra-op threads are process-wide: slots x threads never exceeds the cores
+torch.set_num_threads(THREADS_PER_SLOT)
+
+# =========================
+# REQUEST CONTEXT
+# =========================
+
+class QueueBudget:
+    """Queue time a request has left; spent only while waiting for a slot."""
+
+    def __init__(self, seconds=INTERACTIVE_TIMEOUT):
+        self.remaining = seconds
+
+    def spend(self, seconds):
+        self.remaining -= seconds
+
+
+# (priority, QueueBudget or None); work outside a request is batch
+_request = contextvars.ContextVar("inference_request", default=(BATCH, None))
+
+
+@contextmanager
+def request_context(priority=INTERACTIVE, budget=None):
+    """Tag model calls made inside the block with a priority and queue budget."""
+    token = _request.set((priority, budget))
+    try:
+        yield
+    finally:
+        _request.reset(token)
+
+
+def interactive_request(fn):
+    """Run a (sync) request handler at interactive priority with a queue budget."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with request_context(INTERACTIVE, QueueBudget()):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+class SchedulerOverloaded(Exception):
+    pass
+
+# =========================
+# SCHEDULER
+# =========================
+
+class InferenceScheduler:
+    def __init__(self, slots=INFERENCE_SLOTS):
+        self.slots = slots
+        self.active = 0
+
+        self._cond = threading.Condition()
+        self._waiters = []            # heap of [priority, seq, granted]
+        self._seq = itertools.count()
+
+        self.admitted = 0
+        self.shed = 0
+        self.wait_times = deque(maxlen=1024)
+        self.service_times = deque(maxlen=256)
+
+    def _expected_wait(self, priority):
+        if not self.service_times:
+            return 0.0
+
+        ahead = sum(1 for w in self._waiters if w[0] <= priority)
+        avg_service = sum(self.service_times) / len(self.service_times)
+        return (ahead // self.slots + 1) * avg_service
+
+    def _shed(self):
+        self.shed += 1
+        raise SchedulerOverloaded("Inference queue is full")
+
+    def check(self, priority=BATCH, budget=None):
+        """Shed before expensive non-model work when the queue is already too long."""
+        if budget is None:
+            return
+
+        with self._cond:
+            if self.active < self.slots and not self._waiters:
+                return
+            if self._expected_wait(priority) > budget.remaining:
+                self._shed()
+
+    def acquire(self, priority=BATCH, budget=None):
+        start = time.monotonic()
+
+        with self._cond:
+            if self.active < self.slots and not self._waiters:
+                self.active += 1
+                self.admitted += 1
+                self.wait_times.append(0.0)
+                return
+
+            # Shed now rather than queue work that cannot get a slot in time
+            if budget is not None and self._expected_wait(priority) > budget.remaining:
+                self._shed()
+
+            deadline = None if budget is None else start + budget.remaining
+
+            waiter = [priority, next(self._seq), False]
+            heapq.heappush(self._waiters, waiter)
+
+            while not waiter[2]:
+                timeout = None if deadline is None else deadline - time.monotonic()
+
+                if timeout is not None and timeout <= 0:
+                    self._waiters.remove(waiter)
+                    heapq.heapify(self._waiters)
+                    self._shed()
+
+                self._cond.wait(timeout)
+
+            waited = time.monotonic() - start
+            if budget is not None:
+                budget.spend(waited)
+
+            self.admitted += 1
+            self.wait_times.append(waited)
+
+    def release(self, service_time):
+        with self._cond:
+            self.service_times.append(service_time)
+
+            if self._waiters:
+                # Hand the slot straight to the highest-priority waiter
+                heapq.heappop(self._waiters)[2] = True
+            else:
+                self.active -= 1
+
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        priority, budget = _request.get()
+        self.acquire(priority, budget)
+
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+    def stats(self):
+        with self._cond:
+            waits = sorted(self.wait_times)
+            stats = {
+                "slots": self.slots,
+                "threads_per_slot": THREADS_PER_SLOT,
+                "active": self.active,
+                "queued": len(self._waiters),
+                "admitted": self.admitted,
+                "shed": self.shed
+            }
+
+        if waits:
+            stats["queue_wait_ms"] = {
+                "avg": statistics.fmean(waits) * 1000,
+                "p50": waits[len(waits) // 2] * 1000,
+                "p95": waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000,
+                "max": waits[-1] * 1000
+            }
+        return stats
+
+
+scheduler = InferenceScheduler()
+
+
+def inference_slot():
+    return scheduler.slot()
+
+
+def shed_if_overloaded():
+    """Call before LLM stages: fail fast instead of shedding after them."""
+    scheduler.check(*_request.get())
+
+
+def scheduler_stats():
+    return scheduler.stats()
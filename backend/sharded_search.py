@@ -0,0 +1,103 @@
+"""
+Sharded hybrid retrieval
+Used by faiss_search, bm25_search and hybrid_search when shards/ has been
+built (build_shards.py); the monolithic index and BM25 pickles are then
+never loaded in the API process
+Returns the same result shapes as faiss_search and bm25_search
+"""
+
+import json
+import re
+from pathlib import Path
+
+from .sharding import MANIFEST_NAME, ShardedRetriever
+
+# =========================
+# CONFIG
+# =========================
+
+BASE_DIR = Path(__file__).resolve().parent
+SHARD_DIR = BASE_DIR / "shards"
+ID_MAPPING_PATH = BASE_DIR / "embeddings" / "id_mapping.json"
+TOP_K = 10
+
+# =========================
+# LOAD SHARDS
+# =========================
+
+if (SHARD_DIR / MANIFEST_NAME).exists():
+    retriever = ShardedRetriever(SHARD_DIR)
+
+    with open(ID_MAPPING_PATH, "r") as f:
+        id_mapping = json.load(f)
+else:
+    retriever = None
+
+
+def tokenize(text: str):
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+# =========================
+# RESULT SHAPES
+# =========================
+
+def to_faiss_results(dense):
+    results = []
+    for score, pos in dense:
+        meta = id_mapping[pos]
+        results.append({
+            "score": score,
+            "faiss_index": pos,
+            "id": meta["id"],
+            "category": meta["category"],
+            "image_name": meta["image_name"],
+            "metadata": meta["metadata"]
+        })
+    return results
+
+
+def to_bm25_results(sparse):
+    results = []
+    for score, pos in sparse:
+        meta = id_mapping[pos]
+        results.append({
+            "score": score,
+            "category": meta["category"],
+            "metadata": meta["metadata"]
+        })
+    return results
+
+# =========================
+# SEARCH
+# =========================
+
+def sharded_search(query, query_embedding, category="both", top_k=TOP_K):
+    """Dense + sparse in one fan-out (hybrid_search)."""
+    dense, sparse = retriever.search(
+        query_embedding=query_embedding,
+        tokens=tokenize(query),
+        category=category,
+        top_k=top_k
+    )
+    return to_faiss_results(dense), to_bm25_results(sparse)
+
+
+def sharded_faiss_search(query_embedding, category="both", top_k=TOP_K):
+    """Dense kNN only (image queries)."""
+    dense, _ = retriever.search(
+        query_embedding=query_embedding,
+        tokens=None,
+        category=category,
+        top_k=top_k
+    )
+    return to_faiss_results(dense)
+
+
+def sharded_bm25_search(query, category="both", top_k=TOP_K):
+    _, sparse = retriever.search(
+        query_embedding=None,
+        tokens=tokenize(query),
+        category=category,
+        top_k=top_k
+    )
+    return to_bm25_results(sparse)
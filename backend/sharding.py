@@ -0,0 +1,264 @@
+"""
+Sharded retrieval: FAISS + BM25 segments per shard
+Build → partition the catalog by hash or category
+Query → fan out to shards in parallel, merge per-shard top-k globally
+
+Each shard holds one segment per category, so category filters stay exact.
+BM25 segments share corpus-wide IDF and average length per category,
+which keeps sparse scores identical to the unsharded per-category indexes.
+"""
+
+import heapq
+import json
+import multiprocessing
+import pickle
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import faiss
+import numpy as np
+from rank_bm25 import BM25Okapi
+
+# =========================
+# CONFIG
+# =========================
+
+MANIFEST_NAME = "manifest.json"
+PARTITIONS = ("hash", "category")
+
+# =========================
+# BUILD
+# =========================
+
+def partition_items(keys, categories, n_shards, partition="hash"):
+    if partition == "hash":
+        return [zlib.crc32(str(k).encode("utf-8")) % n_shards for k in keys]
+
+    if partition == "category":
+        order = sorted(set(categories))
+        return [order.index(c) for c in categories]
+
+    raise ValueError(f"Unknown partition: {partition} (expected one of {PARTITIONS})")
+
+
+def global_bm25_stats(segments):
+    """Corpus-wide IDF and average document length over BM25 segments."""
+    nd = Counter()
+    total_docs = 0
+    total_len = 0
+
+    for bm25 in segments:
+        total_docs += bm25.corpus_size
+        total_len += sum(bm25.doc_len)
+        for doc in bm25.doc_freqs:
+            nd.update(doc.keys())
+
+    # Reuse rank_bm25's own IDF formula (with its epsilon floor)
+    stats = BM25Okapi.__new__(BM25Okapi)
+    stats.corpus_size = total_docs
+    stats.epsilon = segments[0].epsilon
+    stats.idf = {}
+    stats._calc_idf(nd)
+
+    return stats.idf, total_len / total_docs
+
+
+def build_shards(embeddings, categories, documents, keys, out_dir, n_shards, partition="hash"):
+    """
+    embeddings: (N, dim) float32, L2-normalized
+    categories: category per item
+    documents: BM25 token list per item
+    keys: stable id per item (hash partitioning)
+    Positions 0..N-1 are what shards return; callers map them back to items.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    assignments = partition_items(keys, categories, n_shards, partition)
+    if partition == "category":
+        n_shards = len(set(categories))
+
+    segments = {}
+    for pos, (shard, category) in enumerate(zip(assignments, categories)):
+        segments.setdefault((shard, category), []).append(pos)
+
+    bm25_segments = {
+        key: BM25Okapi([documents[p] for p in positions])
+        for key, positions in segments.items()
+    }
+
+    for category in set(categories):
+        parts = [b for (_, c), b in bm25_segments.items() if c == category]
+        idf, avgdl = global_bm25_stats(parts)
+        for bm25 in parts:
+            bm25.idf = idf
+            bm25.avgdl = avgdl
+
+    for (shard, category), positions in segments.items():
+        shard_dir = out_dir / f"shard_{shard}"
+        shard_dir.mkdir(exist_ok=True)
+
+        index = faiss.IndexFlatIP(embeddings.shape[1])
+        index.add(np.ascontiguousarray(embeddings[positions], dtype="float32"))
+        faiss.write_index(index, str(shard_dir / f"{category}.index"))
+
+        with open(shard_dir / f"{category}_bm25.pkl", "wb") as f:
+            pickle.dump(
+                {
+                    "bm25": bm25_segments[(shard, category)],
+                    "positions": np.asarray(positions, dtype="int64")
+                },
+                f
+            )
+
+    manifest = {
+        "n_shards": n_shards,
+        "partition": partition,
+        "categories": sorted(set(categories)),
+        "n_items": len(categories),
+        "dim": int(embeddings.shape[1])
+    }
+    with open(out_dir / MANIFEST_NAME, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+# =========================
+# SHARD
+# =========================
+
+def top_k_indices(scores, k):
+    if k >= len(scores):
+        return np.argsort(-scores)
+
+    idx = np.argpartition(-scores, k)[:k]
+    return idx[np.argsort(-scores[idx])]
+
+
+class Shard:
+    def __init__(self, shard_dir):
+        shard_dir = Path(shard_dir)
+        self.segments = {}
+
+        for index_path in sorted(shard_dir.glob("*.index")):
+            category = index_path.stem
+            with open(shard_dir / f"{category}_bm25.pkl", "rb") as f:
+                data = pickle.load(f)
+
+            self.segments[category] = {
+                "index": faiss.read_index(str(index_path)),
+                "bm25": data["bm25"],
+                "positions": data["positions"]
+            }
+
+    def search(self, query_embedding, tokens, category="both", top_k=10):
+        """Returns (dense, sparse) lists of (score, global position)."""
+        dense = []
+        sparse = []
+
+        for name, segment in self.segments.items():
+            if category != "both" and name != category:
+                continue
+
+            positions = segment["positions"]
+            k = min(top_k, len(positions))
+
+            if query_embedding is not None:
+                scores, idx = segment["index"].search(query_embedding, k)
+                dense.extend(
+                    (float(s), int(positions[i]))
+                    for s, i in zip(scores[0], idx[0]) if i >= 0
+                )
+
+            if tokens is not None:
+                scores = segment["bm25"].get_scores(tokens)
+                sparse.extend(
+                    (float(scores[i]), int(positions[i]))
+                    for i in top_k_indices(scores, k)
+                )
+
+        return heapq.nlargest(top_k, dense), heapq.nlargest(top_k, sparse)
+
+# =========================
+# SHARD WORKER PROCESS
+# =========================
+
+_worker_shard = None
+
+
+def _load_worker_shard(shard_dir):
+    global _worker_shard
+    _worker_shard = Shard(shard_dir)
+
+
+def _search_worker_shard(query_embedding, tokens, category, top_k):
+    return _worker_shard.search(query_embedding, tokens, category, top_k)
+
+# =========================
+# FAN-OUT RETRIEVER
+# =========================
+
+class ShardedRetriever:
+    """
+    mode="process": one worker process per shard, each loads only its shard
+    mode="thread":  shards loaded in-process, searched on a thread pool
+    """
+
+    def __init__(self, shard_root, mode="process"):
+        shard_root = Path(shard_root)
+        with open(shard_root / MANIFEST_NAME, "r") as f:
+            self.manifest = json.load(f)
+
+        shard_dirs = [
+            shard_root / f"shard_{i}" for i in range(self.manifest["n_shards"])
+        ]
+        shard_dirs = [d for d in shard_dirs if d.exists()]
+        self.mode = mode
+
+        if mode == "process":
+            # spawn: the parent may hold torch/OpenMP threads that fork would copy
+            context = multiprocessing.get_context("spawn")
+            self.executors = [
+                ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=context,
+                    initializer=_load_worker_shard,
+                    initargs=(str(d),)
+                )
+                for d in shard_dirs
+            ]
+        elif mode == "thread":
+            self.shards = [Shard(d) for d in shard_dirs]
+            self.executor = ThreadPoolExecutor(max_workers=len(self.shards))
+        else:
+            raise ValueError(f"Unknown mode: {mode}")
+
+    def search(self, query_embedding=None, tokens=None, category="both", top_k=10):
+        if self.mode == "process":
+            futures = [
+                ex.submit(_search_worker_shard, query_embedding, tokens, category, top_k)
+                for ex in self.executors
+            ]
+        else:
+            futures = [
+                self.executor.submit(shard.search, query_embedding, tokens, category, top_k)
+                for shard in self.shards
+            ]
+
+        dense = []
+        sparse = []
+        for future in futures:
+            d, s = future.result()
+            dense.extend(d)
+            sparse.extend(s)
+
+        return heapq.nlargest(top_k, dense), heapq.nlargest(top_k, sparse)
+
+    def close(self):
+        if self.mode == "process":
+            for ex in self.executors:
+                ex.shutdown()
+        else:
+            self.executor.shutdown()
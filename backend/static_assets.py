@@ -0,0 +1,99 @@
+"""
+Cache-friendly static serving for catalog images
+Strong content ETags, long-lived Cache-Control, conditional requests
+Thumbnail variant URLs from data/thumbnails/manifest.json
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse
+
+# =========================
+# CONFIG
+# =========================
+
+BASE_DIR = Path(__file__).resolve().parent
+RAW_DIR = BASE_DIR / "data" / "raw"
+THUMBNAIL_DIR = BASE_DIR / "data" / "thumbnails"
+MANIFEST_PATH = THUMBNAIL_DIR / "manifest.json"
+
+STATIC_PREFIX = "/static"
+
+# Manifest paths are relative to data/; map each root to its mount
+URL_PREFIXES = {
+    "raw": STATIC_PREFIX,
+    "thumbnails": "/thumbnails"
+}
+
+# Versioned URLs (?v=<hash>) never change content; plain URLs revalidate daily
+VERSION_LENGTH = 16   # hex chars of SHA-256, as written by create_thumbnails.py
+VERSIONED_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=86400"
+
+# =========================
+# STATIC FILES
+# =========================
+
+_etags = {}
+
+
+def strong_etag(full_path, stat_result):
+    key = (str(full_path), stat_result.st_mtime_ns, stat_result.st_size)
+
+    if key not in _etags:
+        with open(full_path, "rb") as f:
+            _etags[key] = '"' + hashlib.sha256(f.read()).hexdigest()[:32] + '"'
+
+    return _etags[key]
+
+
+def is_current_version(query_string, etag):
+    """?v= must name the served file's content hash, else a stale URL is pinned."""
+    version = parse_qs(query_string.decode("latin-1")).get("v", [""])[-1]
+    return len(version) >= VERSION_LENGTH and etag.strip('"').startswith(version)
+
+
+class CachedStaticFiles(StaticFiles):
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        request_headers = Headers(scope=scope)
+        etag = strong_etag(full_path, stat_result)
+        versioned = is_current_version(scope.get("query_string", b""), etag)
+
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        response.headers["etag"] = etag
+        response.headers["cache-control"] = (
+            VERSIONED_CACHE_CONTROL if versioned else DEFAULT_CACHE_CONTROL
+        )
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+# =========================
+# VARIANT URLS
+# =========================
+
+if MANIFEST_PATH.exists():
+    with open(MANIFEST_PATH, "r") as f:
+        manifest = json.load(f)
+else:
+    manifest = {}
+
+
+def image_urls(category, image_name):
+    variants = manifest.get(f"{category}/{image_name}")
+
+    if variants is None:
+        return {"original": f"{STATIC_PREFIX}/{category}/{image_name}"}
+
+    urls = {}
+    for name, variant in variants.items():
+        root, path = variant["path"].split("/", 1)
+        urls[name] = f"{URL_PREFIXES[root]}/{path}?v={variant['hash']}"
+    return urls
@@ -0,0 +1,145 @@
+"""
+Typeahead suggestions from a precomputed prefix index
+Catalog vocabulary (build_bm25.py) + popular queries
+Live queries are counted privately and only suggested once popular
+Sorted arrays + bisect: no model or LLM calls
+"""
+
+import bisect
+import heapq
+import json
+import threading
+from pathlib import Path
+
+from .cache import LRUCache
+
+# =========================
+# CONFIG
+# =========================
+
+BASE_DIR = Path(__file__).resolve().parent
+SUGGEST_PATH = BASE_DIR / "bm25" / "suggest_vocab.json"
+QUERY_LOG_PATH = BASE_DIR / "logs" / "queries.log"
+
+SUGGEST_K = 8
+QUERY_WEIGHT = 5       # one logged search outweighs one catalog mention
+WARM_MIN_COUNT = 3     # searches before a query is suggested or warmed
+LIVE_QUERY_SLOTS = 4096    # distinct not-yet-popular queries being counted
+MAX_QUERY_TERMS = 10000    # popular queries kept in the prefix index
+
+# =========================
+# PREFIX INDEX
+# =========================
+
+def normalize_query(text: str):
+    return " ".join(text.lower().split())
+
+
+class PrefixIndex:
+    def __init__(self, entries=()):
+        entries = sorted(entries)
+        self.terms = [t for t, _ in entries]
+        self.weights = [w for _, w in entries]
+        self._lock = threading.Lock()
+
+    def _range(self, prefix):
+        lo = bisect.bisect_left(self.terms, prefix)
+        hi = bisect.bisect_left(self.terms, prefix + "\uffff")
+        return lo, hi
+
+    def add(self, term, weight=1):
+        with self._lock:
+            i = bisect.bisect_left(self.terms, term)
+            if i < len(self.terms) and self.terms[i] == term:
+                self.weights[i] += weight
+            else:
+                self.terms.insert(i, term)
+                self.weights.insert(i, weight)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def weight(self, term):
+        with self._lock:
+            i = bisect.bisect_left(self.terms, term)
+            if i < len(self.terms) and self.terms[i] == term:
+                return self.weights[i]
+            return 0
+
+    def complete(self, prefix, k=SUGGEST_K):
+        with self._lock:
+            lo, hi = self._range(prefix)
+            best = heapq.nlargest(k, range(lo, hi), key=self.weights.__getitem__)
+            return [(self.terms[i], self.weights[i]) for i in best]
+
+    def top(self, k):
+        with self._lock:
+            best = heapq.nlargest(k, range(len(self.terms)), key=self.weights.__getitem__)
+            return [(self.terms[i], self.weights[i]) for i in best]
+
+# =========================
+# LOAD INDEXES
+# =========================
+
+if SUGGEST_PATH.exists():
+    with open(SUGGEST_PATH, "r") as f:
+        data = json.load(f)
+else:
+    data = {"vocabulary": [], "queries": []}
+
+vocabulary_index = PrefixIndex(data["vocabulary"])
+query_index = PrefixIndex(data["queries"])   # weights are search counts
+
+# Counts for queries below WARM_MIN_COUNT; rare ones fall out of the LRU
+live_counts = LRUCache(LIVE_QUERY_SLOTS)
+
+_log_lock = threading.Lock()
+
+# =========================
+# SUGGEST
+# =========================
+
+def suggest(prefix, k=SUGGEST_K):
+    prefix = normalize_query(prefix)
+    if not prefix:
+        return []
+
+    scored = {}
+    for term, weight in vocabulary_index.complete(prefix, k):
+        scored[term] = {"text": term, "weight": weight, "type": "term"}
+    for query, count in query_index.complete(prefix, k):
+        weight = count * QUERY_WEIGHT + scored.get(query, {}).get("weight", 0)
+        scored[query] = {"text": query, "weight": weight, "type": "query"}
+
+    return heapq.nlargest(k, scored.values(), key=lambda s: s["weight"])
+
+
+def record_query(query):
+    """Count a search and append it to the log folded in by build_bm25.py."""
+    query = normalize_query(query)
+    if not query:
+        return
+
+    if query_index.weight(query):
+        query_index.add(query)
+    else:
+        # One user's typing, typos or junk never reaches other users:
+        # a query is only suggested once it has been searched repeatedly
+        count = live_counts.get(query, 0) + 1
+        live_counts.put(query, count)
+
+        if count >= WARM_MIN_COUNT and len(query_index) < MAX_QUERY_TERMS:
+            query_index.add(query, count)
+
+    with _log_lock:
+        QUERY_LOG_PATH.parent.mkdir(exist_ok=True)
+        with open(QUERY_LOG_PATH, "a") as f:
+            f.write(query + "\n")
+
+
+def is_popular(query):
+    return query_index.weight(normalize_query(query)) >= WARM_MIN_COUNT
+
+
+def popular_queries(k):
+    return [q for q, count in query_index.top(k) if count >= WARM_MIN_COUNT]
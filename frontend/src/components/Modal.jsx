@@ -24,7 +24,10 @@ function Modal({ item, onClose }) {
   const metadata = item.metadata || item
   const imageName = metadata.image_name || item.image_name
   const category = metadata.category || item.category || 'necklace'
-  const imageUrl = imageName ? `${API_BASE}/static/${category}/${imageName}` : ''
+  const images = item.images || {}
+  const imageUrl = images.original
+    ? `${API_BASE}${images.original}`
+    : imageName ? `${API_BASE}/static/${category}/${imageName}` : ''
   const description = metadata.short_description || item.description || 'No description available'
 
   const handleOverlayClick = (e) => {
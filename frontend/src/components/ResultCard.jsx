@@ -10,7 +10,13 @@ function ResultCard({ item, onClick, index }) {
   const metadata = item.metadata || item
   const imageName = metadata.image_name || item.image_name
   const category = metadata.category || item.category || 'necklace'
-  const imageUrl = imageName ? `${API_BASE}/static/${category}/${imageName}` : ''
+  const images = item.images || {}
+  const imageUrl = images.medium
+    ? `${API_BASE}${images.medium}`
+    : imageName ? `${API_BASE}/static/${category}/${imageName}` : ''
+  const webpSrcSet = images.thumb_webp && images.medium_webp
+    ? `${API_BASE}${images.thumb_webp} 160w, ${API_BASE}${images.medium_webp} 320w`
+    : ''
   const description = metadata.short_description || item.description || 'No description available'
 
   const handleImageLoad = () => {
@@ -30,13 +36,23 @@ function ResultCard({ item, onClick, index }) {
     >
       <div className="card-image-container">
         {!imageError ? (
-          <img
-            src={imageUrl}
-            alt={description}
-            className={`card-image ${imageLoaded ? 'loaded' : ''}`}
-            onLoad={handleImageLoad}
-            onError={handleImageError}
-          />
+          <picture>
+            {webpSrcSet && (
+              <source
+                type="image/webp"
+                srcSet={webpSrcSet}
+                sizes="(max-width: 640px) 170px, 240px"
+              />
+            )}
+            <img
+              src={imageUrl}
+              alt={description}
+              className={`card-image ${imageLoaded ? 'loaded' : ''}`}
+              loading="lazy"
+              onLoad={handleImageLoad}
+              onError={handleImageError}
+            />
+          </picture>
         ) : (
           <div className="card-image-placeholder">
             <span>IMG</span>